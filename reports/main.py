@@ -3,12 +3,27 @@
 Query GitHub API for commits to repositories in parallel.
 """
 
-from github import Github, Auth
-from datetime import datetime
-from typing import List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from github import Github, Auth, GithubException, RateLimitExceededException
+from datetime import datetime, timedelta
+from operator import attrgetter, itemgetter
+from typing import Callable, Iterable, List
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext, suppress
+from itertools import cycle
+from queue import Queue
+from threading import BoundedSemaphore, Lock, Thread, local
+import csv
+import gzip
+import io
 import os
-import pandas as pd
+import time
+from urllib.parse import urlparse
+import requests
+import requests_cache
+from ratelimit import limits, sleep_and_retry
+from tqdm import tqdm
+from urllib3 import Retry
+from urllib3.exceptions import MaxRetryError
 from config import (
     get_time_range,
     get_current_pi,
@@ -17,6 +32,327 @@ from config import (
 )
 from settings import TOKEN_ENV_VAR
 
+# Output CSV columns, in order
+COMMIT_FIELDS = (
+    "sha",
+    "message",
+    "author",
+    "committer",
+    "url",
+    "total_changes",
+    "organization",
+    "repository",
+)
+RESOLVED_FIELDS = (
+    "number",
+    "title",
+    "type",
+    "state",
+    "author",
+    "url",
+    "created_at",
+    "updated_at",
+    "organization",
+    "repository",
+    "contributor",
+)
+
+# On-disk HTTP cache shared across runs. Expired entries are revalidated with
+# ETag/Last-Modified, and 304 responses don't count against the rate limit.
+# GitHub's Cache-Control headers (usually max-age=60) decide freshness;
+# CACHE_EXPIRE_AFTER only applies to responses that don't send any.
+CACHE_NAME = "output/.cache/gh_cache"
+CACHE_EXPIRE_AFTER = 3600  # seconds
+# Entries first stored longer ago than this are dropped at the end of a run,
+# so queries that are no longer made don't grow the cache forever. Expired
+# entries are kept until then, since they are what revalidation uses.
+CACHE_RETENTION = timedelta(days=28)
+
+# Retry transient server errors with exponential backoff. Rate limit errors are
+# not retried here; they are raised so the task can move to another token.
+# GraphQL queries are read-only POSTs, so POST is safe to retry too. Applied by
+# ThrottledSession rather than urllib3, so backoff sleeps don't hold a slot.
+RETRY = Retry(
+    total=5,
+    backoff_factor=2,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=["GET", "POST"],
+)
+
+# Largest page size the REST API allows (PyGithub defaults to 30), applied to
+# every paginated list including search results
+PER_PAGE = 100
+
+# Stay under GitHub's secondary rate limits, which apply to concurrent
+# requests and to requests per minute, across all worker threads
+MAX_CONCURRENT_REQUESTS = 20
+REQUESTS_PER_MINUTE = 900
+
+# Worker threads, unless overridden by this env var
+MAX_WORKERS_ENV_VAR = "REPORTS_MAX_WORKERS"
+DEFAULT_MAX_WORKERS = 32
+
+# Attempts per task before giving up on rate limited tokens
+RATE_LIMIT_ATTEMPTS = 5
+
+# The search API returns at most this many results per query
+SEARCH_RESULT_LIMIT = 1000
+
+# Issue/PR searches run on their own small pool; the search API allows far
+# fewer requests per minute than the rest of the REST API (30 per minute when
+# authenticated). Every search request, including commit searches, is also
+# capped at this many in flight and this many per minute across all threads.
+SEARCH_MAX_WORKERS = 2
+SEARCH_REQUESTS_PER_MINUTE = 30
+
+# GraphQL `nodes(ids:)` accepts at most 100 IDs per query
+GRAPHQL_BATCH_SIZE = 100
+
+# Stats and associated PRs for a batch of commits, by node ID
+COMMIT_NODES_QUERY = """
+query($ids: [ID!]!) {
+  nodes(ids: $ids) {
+    ... on Commit {
+      oid
+      additions
+      deletions
+      associatedPullRequests(first: 2) {
+        nodes {
+          number
+        }
+      }
+    }
+  }
+}
+"""
+# A repo's commit history filtered by author and date, with each commit's
+# stats and associated PRs, 100 commits (the GraphQL maximum) per page
+COMMIT_HISTORY_QUERY = """
+query(
+  $owner: String!
+  $repo: String!
+  $author: CommitAuthor!
+  $since: GitTimestamp!
+  $until: GitTimestamp!
+  $cursor: String
+) {
+  repository(owner: $owner, name: $repo) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(
+            author: $author
+            since: $since
+            until: $until
+            first: 100
+            after: $cursor
+          ) {
+            pageInfo {
+              hasNextPage
+              endCursor
+            }
+            nodes {
+              oid
+              message
+              author {
+                name
+              }
+              committer {
+                name
+              }
+              additions
+              deletions
+              url
+              associatedPullRequests(first: 2) {
+                nodes {
+                  number
+                }
+              }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+request_slots = BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+search_slots = BoundedSemaphore(SEARCH_MAX_WORKERS)
+
+
+@sleep_and_retry
+@limits(calls=REQUESTS_PER_MINUTE, period=60)
+def wait_for_request_budget():
+    """Block until another request fits in the per-minute budget."""
+
+
+@sleep_and_retry
+@limits(calls=SEARCH_REQUESTS_PER_MINUTE, period=60)
+def wait_for_search_budget():
+    """Block until another search request fits in the search API's budget."""
+
+
+class ThrottledSession(requests.Session):
+    """Session whose requests share the global concurrency and rate caps."""
+
+    def send(self, request, **kwargs):
+        is_search = "/search/" in urlparse(request.url).path
+        # Each attempt takes its own budget and slot; the backoff sleep between
+        # attempts happens outside the slot so other threads can use it
+        retry = RETRY
+        while True:
+            wait_for_request_budget()
+            if is_search:
+                wait_for_search_budget()
+            with search_slots if is_search else nullcontext(), request_slots:
+                try:
+                    response, error = super().send(request, **kwargs), None
+                except requests.ConnectionError as e:
+                    response, error = None, e
+            if error is None and not retry.is_retry(request.method, response.status_code):
+                return response
+            try:
+                retry = retry.increment(request.method, request.url)
+            except MaxRetryError:
+                if error is not None:
+                    raise error
+                return response
+            if response is not None:
+                response.close()
+            time.sleep(retry.get_backoff_time())
+
+
+class CachedThrottledSession(requests_cache.CacheMixin, ThrottledSession):
+    """Cached session; only cache misses and revalidations are throttled."""
+
+
+@contextmanager
+def open_csv_gz(path: str):
+    """
+    Open a gzipped CSV file for writing text.
+
+    Compression level 1 is much faster than gzip's default of 9 and still gives
+    most of the size reduction. mtime=0 and an empty stored filename keep the
+    output byte-identical when the same rows are written in the same order, so
+    unchanged reports don't show up as diffs.
+    """
+    with (
+        open(path, "wb", buffering=1 << 20) as raw,
+        gzip.GzipFile(
+            filename="", fileobj=raw, mode="wb", compresslevel=1, mtime=0
+        ) as gz,
+        io.TextIOWrapper(gz, encoding="utf-8", newline="") as f,
+    ):
+        yield f
+
+
+def commit_details(commit, owner: str, repo: str, total_changes: int) -> dict:
+    """Extract the fields we report on from a PyGithub commit."""
+    return {
+        "sha": commit.sha,
+        "message": commit.commit.message.partition("\n")[0],
+        "author": commit.commit.author.name,
+        "committer": commit.commit.committer.name,
+        "url": commit.html_url,
+        "total_changes": total_changes,
+        "organization": owner,
+        "repository": repo,
+    }
+
+
+def graphql_query(g: Github, query: str, variables: dict) -> dict:
+    """
+    Run a GraphQL query and return its response data.
+
+    GraphQL reports rate limiting as an HTTP 200 response with a RATE_LIMITED
+    error, which PyGithub raises as a plain GithubException. Those are re-raised
+    as RateLimitExceededException so callers move on to another token.
+    """
+    try:
+        _, data = g.requester.graphql_query(query, variables)
+    except GithubException as e:
+        errors = (e.data or {}).get("errors", []) if isinstance(e.data, dict) else []
+        headers = e.headers or {}
+        if headers.get("x-ratelimit-remaining") == "0" or any(
+            error.get("type") == "RATE_LIMITED" for error in errors
+        ):
+            raise RateLimitExceededException(e.status, e.data, e.headers) from e
+        raise
+    return data
+
+
+def get_pulls_and_changes(
+    g: Github, commits: list
+) -> tuple[dict[str, list[int]], dict[str, int]]:
+    """
+    Look up each commit's associated PRs and size using batched GraphQL queries.
+
+    Search results don't include commit stats, and reading `commit.stats` would
+    fetch every commit individually, so additions and deletions come from the
+    same queries as the PRs.
+
+    Returns two mappings keyed by commit SHA: associated PR numbers, and total
+    changes (additions + deletions). At most two PR numbers are fetched per
+    commit, which is enough to tell "no PR", "one PR" and "several PRs" apart.
+    """
+    node_ids = [commit.node_id for commit in commits]
+    pull_numbers = {}
+    total_changes = {}
+    for i in range(0, len(node_ids), GRAPHQL_BATCH_SIZE):
+        data = graphql_query(
+            g, COMMIT_NODES_QUERY, {"ids": node_ids[i : i + GRAPHQL_BATCH_SIZE]}
+        )
+        for node in data["data"]["nodes"]:
+            if node:
+                pull_numbers[node["oid"]] = [
+                    pr["number"] for pr in node["associatedPullRequests"]["nodes"]
+                ]
+                total_changes[node["oid"]] = node["additions"] + node["deletions"]
+    return pull_numbers, total_changes
+
+
+def group_commits_by_pr(
+    commits: Iterable,
+    pull_numbers: dict[str, list[int]],
+    get_sha: Callable = attrgetter("sha"),
+) -> list:
+    """
+    Keep the first commit of each PR plus every commit not associated with a PR.
+
+    Commits associated with more than one PR are dropped. `get_sha` reads the
+    SHA from a commit; the default suits PyGithub commits.
+    """
+    seen_prs: set[int] = set()
+    pr_commits = []
+    standalone_commits = []
+
+    for commit in commits:
+        numbers = pull_numbers.get(get_sha(commit), [])
+        if len(numbers) == 1:
+            if (number := numbers[0]) not in seen_prs:
+                seen_prs.add(number)
+                pr_commits.append(commit)
+        elif len(numbers) == 0:
+            standalone_commits.append(commit)
+
+    return pr_commits + standalone_commits
+
+
+def get_renamed_repos(
+    g: Github, tasks: List[tuple]
+) -> dict[tuple[str, str], tuple[str, str]]:
+    """
+    Map the current (lowercased) owner/name of each configured repo to the
+    configured (owner, repo), so results for renamed repos can be attributed.
+    """
+    renamed = {}
+    for owner, repo, _ in tasks:
+        # Non-lazy get_repo follows GitHub's redirect to the repo's current name
+        current = g.get_repo(f"{owner}/{repo}")
+        renamed[(current.owner.login.lower(), current.name.lower())] = (owner, repo)
+    return renamed
+
 
 def get_commits_for_repo_author(
     g: Github,
@@ -29,53 +365,195 @@ def get_commits_for_repo_author(
     """
     Query GitHub API for commits by a specific author in a repo.
 
+    Walks the default branch history with a GraphQL query that returns each
+    commit's details, stats and associated PRs, so there is one request per
+    100 commits and no PyGithub commit objects are built.
+
+    Returns list of commit detail dicts.
+    """
+    try:
+        # History filters on the author's node ID, not their login
+        variables = {
+            "owner": owner,
+            "repo": repo,
+            "author": {"id": g.get_user(author).node_id},
+            # Include the whole end day, like the search path's date range
+            "since": start_date.strftime("%Y-%m-%dT00:00:00Z"),
+            "until": end_date.strftime("%Y-%m-%dT23:59:59Z"),
+            "cursor": None,
+        }
+        commits = []
+        pull_numbers = {}
+        while True:
+            data = graphql_query(g, COMMIT_HISTORY_QUERY, variables)
+            branch = data["data"]["repository"]["defaultBranchRef"]
+            if branch is None:  # empty repository
+                break
+            history = branch["target"]["history"]
+            for node in history["nodes"]:
+                commits.append(
+                    {
+                        "sha": node["oid"],
+                        "message": node["message"].partition("\n")[0],
+                        "author": node["author"]["name"],
+                        "committer": node["committer"]["name"],
+                        "url": node["url"],
+                        "total_changes": node["additions"] + node["deletions"],
+                        "organization": owner,
+                        "repository": repo,
+                    }
+                )
+                pull_numbers[node["oid"]] = [
+                    pr["number"] for pr in node["associatedPullRequests"]["nodes"]
+                ]
+            if not history["pageInfo"]["hasNextPage"]:
+                break
+            variables["cursor"] = history["pageInfo"]["endCursor"]
+
+        return group_commits_by_pr(commits, pull_numbers, itemgetter("sha"))
+    except RateLimitExceededException:
+        raise
+    except Exception as e:
+        tqdm.write(f"  Error processing {owner}/{repo} for {author}: {e}")
+        return []
+
+
+def get_commits_for_contributor(
+    g: Github,
+    tasks_for_user: List[tuple],
+    user: str,
+    start_date: datetime,
+    end_date: datetime,
+) -> List[dict]:
+    """
+    Query GitHub API for commits by a contributor across all of their repos.
+
+    Uses the GitHub search API with one `repo:` filter per configured repo in a
+    single query, and resolves the PR associated with each commit with batched
+    GraphQL queries. Falls back to listing commits repo by repo when the search
+    would be truncated or incomplete, or when it fails (e.g. a configured repo
+    is missing or not visible to the token, which rejects the whole query), so
+    one bad repo doesn't drop the contributor's other commits.
+
     Returns list of commit detail dicts (not commit objects) to avoid
     thread safety issues with PyGithub objects.
     """
+
+    def get_commits_repo_by_repo():
+        return [
+            details
+            for owner, repo, _ in tasks_for_user
+            for details in get_commits_for_repo_author(
+                g, owner, repo, user, start_date, end_date
+            )
+        ]
+
     try:
-        repository = g.get_repo(f"{owner}/{repo}")
-        commits = repository.get_commits(
-            author=author, since=start_date, until=end_date
+        start_str = start_date.strftime("%Y-%m-%d")
+        end_str = end_date.strftime("%Y-%m-%d")
+        repo_filters = " ".join(
+            f"repo:{owner}/{repo}" for owner, repo, _ in tasks_for_user
+        )
+        # Newest first, like the per-repo history, so both paths keep the same
+        # commit for each PR and the report is stable between runs
+        commits = g.search_commits(
+            f"{repo_filters} author:{user} committer-date:{start_str}..{end_str}",
+            sort="committer-date",
+            order="desc",
         )
 
-        # Group commits by PR
-        prs = []
-        pr_commits = []
-        standalone_commits = []
-
+        if commits.totalCount > SEARCH_RESULT_LIMIT:
+            return get_commits_repo_by_repo()
+
+        # Report under the configured owner/repo names, which plot.py matches
+        # against objectives; the API may differ in case or return a new name
+        configured = {
+            (owner.lower(), repo.lower()): (owner, repo)
+            for owner, repo, _ in tasks_for_user
+        }
+        looked_up_renames = False
+        commits_by_repo = {}
         for commit in commits:
-            pulls = commit.get_pulls()
-            if pulls.totalCount == 1:
-                if (number := pulls[0].number) not in prs:
-                    pr_commits.append(commit)
-                    prs.append(number)
-            elif pulls.totalCount == 0:
-                standalone_commits.append(commit)
+            key = (commit.repository.owner.login.lower(), commit.repository.name.lower())
+            if key not in configured and not looked_up_renames:
+                configured.update(get_renamed_repos(g, tasks_for_user))
+                looked_up_renames = True
+            key = configured.get(key, key)
+            commits_by_repo.setdefault(key, []).append(commit)
+
+        # Set when the search timed out; every page can update it
+        if commits.incomplete_results:
+            return get_commits_repo_by_repo()
+
+        pull_numbers, total_changes = get_pulls_and_changes(
+            g, [commit for group in commits_by_repo.values() for commit in group]
+        )
 
         # Extract details immediately (avoid returning PyGithub objects)
         results = []
-        for commit in pr_commits + standalone_commits:
-            results.append(
-                {
-                    "sha": commit.sha,
-                    "message": commit.commit.message.split("\n")[0],
-                    "author": commit.commit.author.name,
-                    "committer": commit.commit.committer.name,
-                    "url": commit.html_url,
-                    "total_changes": commit.stats.total if commit.stats else 0,
-                    "organization": owner,
-                    "repository": repo,
-                }
-            )
+        for (owner, repo), repo_commits in commits_by_repo.items():
+            for commit in group_commits_by_pr(repo_commits, pull_numbers):
+                results.append(
+                    commit_details(
+                        commit, owner, repo, total_changes.get(commit.sha, 0)
+                    )
+                )
         return results
+    except RateLimitExceededException:
+        raise
+    except GithubException as e:
+        tqdm.write(f"  Search failed for {user} ({e}), listing commits repo by repo")
+        return get_commits_repo_by_repo()
     except Exception as e:
-        print(f"  Error processing {owner}/{repo} for {author}: {e}")
+        tqdm.write(f"  Error processing commits for {user}: {e}")
         return []
 
 
+def search_closed_items(
+    g: Github, query: str, start_date: datetime, end_date: datetime
+) -> List[dict] | None:
+    """
+    Search for issues/PRs matching `query` that were closed between two dates.
+
+    Returns None if the search hits SEARCH_RESULT_LIMIT and the window spans
+    more than one day, so the caller can split it instead of silently losing
+    results.
+
+    Returns list of issue/PR detail dicts (not PyGithub objects) to avoid
+    thread safety issues.
+    """
+    start_str = start_date.strftime("%Y-%m-%d")
+    end_str = end_date.strftime("%Y-%m-%d")
+    items = g.search_issues(f"{query} closed:{start_str}..{end_str}")
+    if items.totalCount >= SEARCH_RESULT_LIMIT:
+        if start_date.date() < end_date.date():
+            return None
+        tqdm.write(f"  Search truncated at {SEARCH_RESULT_LIMIT} results on {start_str}")
+
+    results = []
+    for item in items:
+        is_pr = item.pull_request is not None
+        results.append(
+            {
+                "number": item.number,
+                "title": item.title,
+                "type": "PR" if is_pr else "Issue",
+                "state": item.state,
+                "author": item.user.login if item.user else None,
+                "url": item.html_url,
+                "created_at": item.created_at.isoformat() if item.created_at else None,
+                "updated_at": item.updated_at.isoformat() if item.updated_at else None,
+                # item.repository is a Repository object with owner.login and name
+                "organization": item.repository.owner.login,
+                "repository": item.repository.name,
+            }
+        )
+    return results
+
+
 def get_resolved_for_contributor(
-    g: Github,
-    tasks: List[tuple],
+    search: Callable[[str, datetime, datetime], Future],
+    tasks: frozenset[tuple],
     contributor: str,
     start_date: datetime,
     end_date: datetime,
@@ -86,62 +564,71 @@ def get_resolved_for_contributor(
     "Involved" means the contributor was the author, assignee, mentioned, or commented.
     Uses the GitHub search API with the `involves:` qualifier and multiple `repo:` filters
     in a single query, then returns only results matching the configured repos.
+    `tasks` is a set of (owner, repo, contributor) tuples so that check is a
+    constant-time lookup per result.
+
+    `search` submits one search_closed_items call and returns its future.
+    Windows that hit the search API's result cap are split in half and searched
+    again, recursively, so prolific contributors don't lose results.
 
     Returns list of issue/PR detail dicts (not PyGithub objects) to avoid
     thread safety issues.
     """
     try:
-        start_str = start_date.strftime("%Y-%m-%d")
-        end_str = end_date.strftime("%Y-%m-%d")
-        repo_filters = " ".join(f"repo:{owner}/{repo}" for owner, repo, _ in tasks)
-        base_query = (
-            f"{repo_filters} "
-            f"involves:{contributor} "
-            f"closed:{start_str}..{end_str}"
-        )
-
-        issues = g.search_issues(f"is:issue {base_query}")
-        prs = g.search_issues(f"is:pr {base_query} -author:{contributor}")
+        # Sorted so the query (and its HTTP cache key) is stable between runs
+        repos = sorted({(owner, repo) for owner, repo, _ in tasks})
+        repo_filters = " ".join(f"repo:{owner}/{repo}" for owner, repo in repos)
+        base_query = f"{repo_filters} involves:{contributor}"
+
+        windows = [
+            (f"is:issue {base_query}", start_date, end_date),
+            (f"is:pr {base_query} -author:{contributor}", start_date, end_date),
+        ]
+        found = []
+        while windows:
+            futures = {search(*window): window for window in windows}
+            windows = []
+            for future in as_completed(futures):
+                items = future.result()
+                if items is None:
+                    query, start, end = futures[future]
+                    mid = start + timedelta(days=(end - start).days // 2)
+                    windows.append((query, start, mid))
+                    windows.append((query, mid + timedelta(days=1), end))
+                else:
+                    found.extend(items)
 
         results = []
-        for item in [*issues, *prs]:
-            # item.repository is a Repository object with owner.login and name
-            item_owner = item.repository.owner.login
-            item_repo = item.repository.name
-            if (item_owner, item_repo, contributor) not in tasks:
+        for item in found:
+            if (item["organization"], item["repository"], contributor) not in tasks:
                 continue
-            is_pr = item.pull_request is not None
-            results.append(
-                {
-                    "number": item.number,
-                    "title": item.title,
-                    "type": "PR" if is_pr else "Issue",
-                    "state": item.state,
-                    "author": item.user.login if item.user else None,
-                    "url": item.html_url,
-                    "created_at": item.created_at.isoformat() if item.created_at else None,
-                    "updated_at": item.updated_at.isoformat() if item.updated_at else None,
-                    "organization": item_owner,
-                    "repository": item_repo,
-                    "contributor": contributor,
-                }
-            )
+            results.append({**item, "contributor": contributor})
         return results
+    except RateLimitExceededException:
+        raise
     except Exception as e:
-        print(f"  Error fetching issues/PRs for {contributor}: {e}")
+        tqdm.write(f"  Error fetching issues/PRs for {contributor}: {e}")
         return []
 
 
-def main(token: str = None, pi: str = None, max_workers: int = 10):
+def main(tokens: List[str] = None, pi: str = None, max_workers: int = None):
     """
     Query GitHub for commits using parallel requests.
 
     Args:
-        token: GitHub personal access token
+        tokens: GitHub personal access tokens. Worker threads are spread
+            round-robin across them so each token's rate limit adds up.
+            At least one is required, since the GraphQL API rejects
+            unauthenticated requests.
         pi: Optional PI to filter repos/contributors (e.g., "pi-26.1").
             If None, uses current PI based on today's date.
-        max_workers: Number of parallel threads (default 10)
+        max_workers: Number of parallel threads. Defaults to one per submitted
+            task (a commits task per contributor with repos, and a resolved
+            issues/PRs task per contributor), capped at DEFAULT_MAX_WORKERS.
     """
+    if not tokens:
+        raise ValueError(f"Set {TOKEN_ENV_VAR} or GITHUB_TOKEN environment variable")
+
     # Default to current PI if not specified
     if pi is None:
         pi = get_current_pi()
@@ -164,74 +651,236 @@ def main(token: str = None, pi: str = None, max_workers: int = 10):
     if len(tasks) < 1:
         raise ValueError("No repos x contributors found in config.")
 
+    tasks_by_user = {}
+    for task in tasks:
+        tasks_by_user.setdefault(task[2], []).append(task)
+
+    max_workers = max_workers or min(
+        DEFAULT_MAX_WORKERS, len(tasks_by_user) + len(contributors)
+    )
     print(
         f"Querying {len(tasks)} repo×contributor combinations with {max_workers} workers..."
     )
 
-    all_commits = []
-    all_resolved = []
+    # Every requests session created from here on (including the ones inside
+    # PyGithub clients) reads from and writes to the cache, and is throttled
+    requests_cache.install_cache(
+        CACHE_NAME,
+        backend="sqlite",
+        session_factory=CachedThrottledSession,
+        expire_after=CACHE_EXPIRE_AFTER,
+        cache_control=True,
+        match_headers=["Accept"],
+    )
 
     # Use thread pool for parallel API calls
-    # Each thread gets its own Github client to avoid rate limit issues
-    def make_client():
-        if token:
-            return Github(auth=Auth.Token(token))
-        return Github()
-
-    def process_commits_task(task):
-        owner, repo, username = task
-        g = make_client()
-        try:
-            return get_commits_for_repo_author(
-                g, owner, repo, username, time_start, time_end
-            )
-        finally:
-            g.close()
+    # Each thread lazily creates one Github client and reuses it (and its
+    # pooled connections) for every task it runs; PyGithub clients are not
+    # shared between threads.
+    thread_clients = local()
+    clients = []
+    clients_lock = Lock()
+
+    # Tokens are handed out round-robin. A token that runs out of quota is
+    # parked until its rate limit resets.
+    token_cycle = cycle(tokens)
+    token_reset_at = dict.fromkeys(tokens, 0.0)
+    tokens_lock = Lock()
+
+    def next_token():
+        with tokens_lock:
+            for _ in tokens:
+                token = next(token_cycle)
+                if token_reset_at[token] <= time.time():
+                    return token
+            # Every token is rate limited, wait for the first one to reset
+            token = min(tokens, key=token_reset_at.get)
+            wait = token_reset_at[token] - time.time()
+        time.sleep(max(wait, 0))
+        return token
+
+    def get_client():
+        g = getattr(thread_clients, "g", None)
+        if g is None:
+            token = next_token()
+            # retry=None: ThrottledSession retries, outside its concurrency slots
+            g = Github(auth=Auth.Token(token), per_page=PER_PAGE, retry=None)
+            thread_clients.g = g
+            thread_clients.token = token
+            with clients_lock:
+                clients.append(g)
+        return g
+
+    def run_with_client(func, *args):
+        for attempt in range(RATE_LIMIT_ATTEMPTS):
+            try:
+                return func(get_client(), *args)
+            except RateLimitExceededException as e:
+                last_error = e
+                headers = e.headers or {}
+                reset_at = max(
+                    float(headers.get("x-ratelimit-reset", 0)),
+                    time.time() + float(headers.get("retry-after", 2**attempt)),
+                )
+                with tokens_lock:
+                    token_reset_at[thread_clients.token] = reset_at
+                # Switch to the next available token
+                thread_clients.g = None
+        # Raised rather than returning an empty result, which callers can't
+        # tell apart from a window with nothing in it
+        tqdm.write(f"  Giving up on {func.__name__}: every token is rate limited")
+        raise last_error
+
+    task_set = frozenset(tasks)
+
+    def process_commits_task(username):
+        return run_with_client(
+            get_commits_for_contributor,
+            tasks_by_user[username],
+            username,
+            time_start,
+            time_end,
+        )
+
+    def submit_search(query, start, end):
+        return search_executor.submit(
+            run_with_client, search_closed_items, query, start, end
+        )
 
     def process_resolved_task(username):
-        g = make_client()
+        return get_resolved_for_contributor(
+            submit_search, task_set, username, time_start, time_end
+        )
+
+    # Commits are streamed to the CSV as futures complete: done-callbacks run
+    # in the worker threads and push rows onto a queue drained by one writer.
+    # Results are queued in submission order, holding back any that finish
+    # early, so the report is identical between runs when the data is.
+    csv_filename = f"output/{pi}-authored-commits.csv.gz"
+    resolved_filename = f"output/{pi}-resolved-issues-prs.csv.gz"
+    # Both reports are written to temp files next to them and only replace
+    # them once the whole run succeeds, so a failed run leaves them untouched
+    csv_tmp_filename = f"{csv_filename}.tmp"
+    resolved_tmp_filename = f"{resolved_filename}.tmp"
+    commit_rows = Queue()
+    commits_written = 0
+    writer_errors = []
+    commits_order = {}
+    finished_commits = {}
+    next_commits = 0
+    commits_lock = Lock()
+
+    def write_commits():
+        nonlocal commits_written
         try:
-            return get_resolved_for_contributor(
-                g, tasks, username, time_start, time_end
-            )
+            with open_csv_gz(csv_tmp_filename) as f:
+                writer = csv.DictWriter(f, fieldnames=COMMIT_FIELDS)
+                writer.writeheader()
+                while (row := commit_rows.get()) is not None:
+                    writer.writerow(row)
+                    commits_written += 1
+        except BaseException as e:
+            # Re-raised by the main thread once the writer has been joined
+            writer_errors.append(e)
+
+    def enqueue_commits(future):
+        nonlocal next_commits
+        # Failed tasks are raised from the main loop instead
+        if future.cancelled() or future.exception() is not None:
+            return
+        with commits_lock:
+            finished_commits[commits_order[future]] = future.result()
+            while next_commits in finished_commits:
+                for row in finished_commits.pop(next_commits):
+                    commit_rows.put(row)
+                next_commits += 1
+
+    def resolved_key(item):
+        return (item["organization"], item["repository"], item["number"])
+
+    # Several contributors can be involved in the same issue/PR, keep the one
+    # listed first in the config
+    all_resolved = []
+    seen_resolved = set()
+
+    writer_thread = Thread(target=write_commits)
+    writer_thread.start()
+
+    try:
+        # The writer is always stopped and joined, even on errors or Ctrl+C
+        try:
+            # The search pool is entered first so it outlives the tasks submitting to it
+            with (
+                ThreadPoolExecutor(max_workers=SEARCH_MAX_WORKERS) as search_executor,
+                ThreadPoolExecutor(max_workers=max_workers) as executor,
+            ):
+                try:
+                    commits_futures = {executor.submit(process_commits_task, username): username for username in tasks_by_user}
+                    resolved_issues_futures = {executor.submit(process_resolved_task, username): username for _, username in contributors}
+                    total = len(commits_futures) + len(resolved_issues_futures)
+
+                    for i, future in enumerate(commits_futures):
+                        commits_order[future] = i
+                        future.add_done_callback(enqueue_commits)
+
+                    with tqdm(total=total, desc="  Progress") as pbar:
+                        for future in as_completed(commits_futures):
+                            pbar.update(1)
+                            future.result()
+
+                        for future in as_completed(resolved_issues_futures):
+                            pbar.update(1)
+                            future.result()
+
+                    for future in resolved_issues_futures:
+                        for item in future.result():
+                            if (key := resolved_key(item)) not in seen_resolved:
+                                seen_resolved.add(key)
+                                all_resolved.append(item)
+                except BaseException:
+                    # Drop queued tasks rather than running them before exiting
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    search_executor.shutdown(wait=False, cancel_futures=True)
+                    raise
         finally:
-            g.close()
-
-    completed = 0
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        commits_futures = {executor.submit(process_commits_task, task): task for task in tasks}
-        resolved_issues_futures = {executor.submit(process_resolved_task, username): username for _, username in contributors}
-
-        for future in as_completed(commits_futures):
-            completed += 1
-            print(f"  Progress: {completed}/{len(tasks) + len(contributors)}")
-            commits = future.result()
-            all_commits.extend(commits)
-        
-        for future in as_completed(resolved_issues_futures):
-            completed += 1
-            print(f"  Progress: {completed}/{len(tasks)+ len(contributors)}")
-            resolved_issues = future.result()
-            all_resolved.extend(resolved_issues)
-
-    print(f"Found {len(all_commits)} authored commits")
+            for g in clients:
+                g.close()
+
+            commit_rows.put(None)
+            writer_thread.join()
+
+        if writer_errors:
+            raise writer_errors[0]
+
+        # Resolved rows are few, write them sorted so the CSV diffs cleanly
+        with open_csv_gz(resolved_tmp_filename) as f:
+            writer = csv.DictWriter(f, fieldnames=RESOLVED_FIELDS)
+            writer.writeheader()
+            writer.writerows(sorted(all_resolved, key=resolved_key))
+    except BaseException:
+        for path in (csv_tmp_filename, resolved_tmp_filename):
+            with suppress(FileNotFoundError):
+                os.remove(path)
+        raise
+
+    os.replace(csv_tmp_filename, csv_filename)
+    os.replace(resolved_tmp_filename, resolved_filename)
+
+    cache = requests_cache.get_cache()
+    cache.delete(older_than=CACHE_RETENTION)
+    cache.responses.vacuum()
+
+    print(f"Found {commits_written} authored commits")
     print(f"Found {len(all_resolved)} resolved issues/PRs")
-
-    df = pd.DataFrame(all_commits)
-    csv_filename = f"output/{pi}-authored-commits.csv"
-    df.to_csv(csv_filename, index=False)
     print(f"Saved to {csv_filename}")
-
-    df_resolved = (
-        pd.DataFrame(all_resolved)
-            .drop_duplicates(subset=["organization", "repository", "number"])
-            .sort_values(by=["organization", "repository", "number"])
-    )
-    resolved_filename = f"output/{pi}-resolved-issues-prs.csv"
-    df_resolved.to_csv(resolved_filename, index=False)
     print(f"Saved to {resolved_filename}")
 
 
 if __name__ == "__main__":
-    token = os.environ.get(TOKEN_ENV_VAR) or os.environ.get("GITHUB_TOKEN")
-    main(token=token)
+    # TOKEN_ENV_VAR may hold several comma-separated tokens
+    token_list = os.environ.get(TOKEN_ENV_VAR) or os.environ.get("GITHUB_TOKEN") or ""
+    max_workers = os.environ.get(MAX_WORKERS_ENV_VAR)
+    main(
+        tokens=[token.strip() for token in token_list.split(",") if token.strip()],
+        max_workers=int(max_workers) if max_workers else None,
+    )
@@ -74,8 +74,8 @@ def main(pi: str = None, show_labels: bool = False):
     if pi is None:
         pi = get_current_pi()
 
-    plot_counts(f"output/{pi}-resolved-issues-prs.csv", pi, title="resolved issues and PRs")
-    plot_counts(f"output/{pi}-authored-commits.csv", pi, title="authored commits")
+    plot_counts(f"output/{pi}-resolved-issues-prs.csv.gz", pi, title="resolved issues and PRs")
+    plot_counts(f"output/{pi}-authored-commits.csv.gz", pi, title="authored commits")
 
 
 def plot_counts(csv_filename: str, pi: str, title: str, show_labels: bool = False):
@@ -197,7 +197,7 @@ def plot_counts(csv_filename: str, pi: str, title: str, show_labels: bool = Fals
     docs_images = Path(__file__).parent.parent / "docs" / "images"
     docs_images.mkdir(exist_ok=True)
     plt.savefig(
-        docs_images / Path(csv_filename).name.replace(".csv", ".png"),
+        docs_images / Path(csv_filename).name.replace(".csv.gz", ".png"),
         bbox_inches="tight",
         dpi=150,
     )
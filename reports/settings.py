@@ -15,6 +15,7 @@ SITE_URL = "nasa-impact.github.io/science-support"  # GitHub Pages URL (no https
 
 # ── Authentication ────────────────────────────────────────────────
 TOKEN_ENV_VAR = "GH_PAT"  # env var name for the GitHub PAT
+# main.py accepts several comma-separated PATs here to multiply its rate limit
 # Also update the secret name in .github/workflows/update-reports.yml
 
 # ── Derived values (do not edit) ──────────────────────────────────